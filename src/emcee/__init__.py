@@ -21,7 +21,7 @@ __description__ = "The Python ensemble sampling toolkit for MCMC"
 
 from .emcee_version import __version__  # isort:skip
 
-from . import autocorr, backends, moves
+from . import autocorr, backends, cuda, moves
 from .ensemble import EnsembleSampler
 from .state import State
 
@@ -31,5 +31,6 @@ __all__ = [
     "moves",
     "autocorr",
     "backends",
+    "cuda",
     "__version__",
 ]
@@ -14,24 +14,41 @@ class Backend(object):
     def __init__(self):
         self.initialized = False
 
-    def reset(self, nwalkers, ndim):
+    def reset(self, nwalkers, ndim, dtype=None):
         """Clear the state of the chain and empty the backend
 
         Args:
             nwakers (int): The size of the ensemble
             ndim (int): The number of dimensions
+            dtype (Optional): The floating point type used to store the
+                chain. Using ``np.float32`` halves the memory used by long
+                runs while the sampler itself still works in double
+                precision. (default: ``np.float64``)
 
         """
+        dtype = self._get_chain_dtype(dtype)
         self.nwalkers = int(nwalkers)
         self.ndim = int(ndim)
         self.iteration = 0
         self.accepted = np.zeros(self.nwalkers)
-        self.chain = np.empty((0, self.nwalkers, self.ndim))
+        self.chain = np.empty((0, self.nwalkers, self.ndim), dtype=dtype)
         self.log_prob = np.empty((0, self.nwalkers))
         self.blobs = None
         self.random_state = None
         self.initialized = True
 
+    @staticmethod
+    def _get_chain_dtype(dtype):
+        if dtype is None:
+            return np.dtype(np.float64)
+        dtype = np.dtype(dtype)
+        if not np.issubdtype(dtype, np.floating):
+            raise ValueError(
+                "the chain must be stored as a floating point type, "
+                "not {0}".format(dtype)
+            )
+        return dtype
+
     def has_blobs(self):
         """Returns ``True`` if the model includes blobs"""
         return self.blobs is not None
@@ -118,7 +135,9 @@ class Backend(object):
         if blobs is not None:
             blobs = blobs[0]
         return State(
-            self.get_chain(discard=it - 1)[0],
+            # The chain might be stored at a lower precision than the sampler
+            # works with
+            np.asarray(self.get_chain(discard=it - 1)[0], dtype=np.float64),
             log_prob=self.get_log_prob(discard=it - 1)[0],
             blobs=blobs,
             random_state=self.random_state,
@@ -144,6 +163,7 @@ class Backend(object):
 
         """
         x = self.get_chain(discard=discard, thin=thin)
+        x = np.asarray(x, dtype=np.float64)
         return thin * autocorr.integrated_time(x, **kwargs)
 
     @property
@@ -169,7 +189,7 @@ class Backend(object):
         """
         self._check_blobs(blobs)
         i = ngrow - (len(self.chain) - self.iteration)
-        a = np.empty((i, self.nwalkers, self.ndim))
+        a = np.empty((i, self.nwalkers, self.ndim), dtype=self.chain.dtype)
         self.chain = np.concatenate((self.chain, a), axis=0)
         a = np.empty((i, self.nwalkers))
         self.log_prob = np.concatenate((self.log_prob, a), axis=0)
@@ -227,6 +247,67 @@ class Backend(object):
         self.random_state = state.random_state
         self.iteration += 1
 
+    @staticmethod
+    def _check_chunk(coords, log_prob, accepted, blobs, shape, has_blobs):
+        # The metadata is passed in so that the HDF backend can read it while
+        # it already has the file open. Storage for the blobs is allocated by
+        # ``grow`` before anything is saved so they must always match.
+        if bool(has_blobs) != (blobs is not None):
+            raise ValueError("inconsistent use of blobs")
+        nwalkers, ndim = shape
+        n = len(coords)
+        if np.shape(coords) != (n, nwalkers, ndim):
+            raise ValueError(
+                "invalid coordinate dimensions; expected {0}".format(
+                    (n, nwalkers, ndim)
+                )
+            )
+        if np.shape(log_prob) != (n, nwalkers):
+            raise ValueError(
+                "invalid log probability size; expected {0}".format(
+                    (n, nwalkers)
+                )
+            )
+        if blobs is not None and np.shape(blobs)[:2] != (n, nwalkers):
+            raise ValueError(
+                "invalid blobs size; expected {0}".format((n, nwalkers))
+            )
+        if np.shape(accepted) != (n, nwalkers):
+            raise ValueError(
+                "invalid acceptance size; expected {0}".format((n, nwalkers))
+            )
+
+    def save_chunk(
+        self, coords, log_prob, accepted, blobs=None, random_state=None
+    ):
+        """Save several consecutive steps to the backend at once
+
+        Args:
+            coords (ndarray[nsteps, nwalkers, ndim]): The positions of the
+                walkers at each step.
+            log_prob (ndarray[nsteps, nwalkers]): The log probabilities of
+                the walkers at each step.
+            accepted (ndarray[nsteps, nwalkers]): Boolean flags indicating
+                whether or not the proposal for each walker was accepted at
+                each step.
+            blobs (Optional): The blobs for each step if the model has blobs.
+            random_state (Optional): The state of the random number generator
+                after the last step.
+
+        """
+        self._check_chunk(
+            coords, log_prob, accepted, blobs, self.shape, self.has_blobs()
+        )
+
+        i, n = self.iteration, len(coords)
+        self.chain[i : i + n] = coords
+        self.log_prob[i : i + n] = log_prob
+        if blobs is not None:
+            self.blobs[i : i + n] = blobs
+        self.accepted += np.sum(accepted, axis=0)
+        self.random_state = random_state
+        self.iteration += n
+
     def __enter__(self):
         return self
 
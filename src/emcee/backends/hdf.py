@@ -59,14 +59,17 @@ class HDFBackend(Backend):
             )
         return h5py.File(self.filename, mode)
 
-    def reset(self, nwalkers, ndim):
+    def reset(self, nwalkers, ndim, dtype=None):
         """Clear the state of the chain and empty the backend
 
         Args:
             nwakers (int): The size of the ensemble
             ndim (int): The number of dimensions
+            dtype (Optional): The floating point type used to store the
+                chain. (default: ``np.float64``)
 
         """
+        dtype = self._get_chain_dtype(dtype)
         with self.open("a") as f:
             if self.name in f:
                 del f[self.name]
@@ -82,7 +85,7 @@ class HDFBackend(Backend):
                 "chain",
                 (0, nwalkers, ndim),
                 maxshape=(None, nwalkers, ndim),
-                dtype=np.float64,
+                dtype=dtype,
             )
             g.create_dataset(
                 "log_prob",
@@ -205,6 +208,52 @@ class HDFBackend(Backend):
 
             g.attrs["iteration"] = iteration + 1
 
+    def save_chunk(
+        self, coords, log_prob, accepted, blobs=None, random_state=None
+    ):
+        """Save several consecutive steps to the backend at once
+
+        This opens the file once, both to check the inputs and to write each
+        dataset with a single slice assignment, instead of once per step.
+
+        Args:
+            coords (ndarray[nsteps, nwalkers, ndim]): The positions of the
+                walkers at each step.
+            log_prob (ndarray[nsteps, nwalkers]): The log probabilities of
+                the walkers at each step.
+            accepted (ndarray[nsteps, nwalkers]): Boolean flags indicating
+                whether or not the proposal for each walker was accepted at
+                each step.
+            blobs (Optional): The blobs for each step if the model has blobs.
+            random_state (Optional): The state of the random number generator
+                after the last step.
+
+        """
+        with self.open("a") as f:
+            g = f[self.name]
+            iteration = g.attrs["iteration"]
+            self._check_chunk(
+                coords,
+                log_prob,
+                accepted,
+                blobs,
+                (int(g.attrs["nwalkers"]), int(g.attrs["ndim"])),
+                bool(g.attrs["has_blobs"]),
+            )
+            n = len(coords)
+
+            g["chain"][iteration : iteration + n] = coords
+            g["log_prob"][iteration : iteration + n] = log_prob
+            if blobs is not None:
+                g["blobs"][iteration : iteration + n] = blobs
+            g["accepted"][:] += np.sum(accepted, axis=0)
+
+            if random_state is not None:
+                for i, v in enumerate(random_state):
+                    g.attrs["random_state_{0}".format(i)] = v
+
+            g.attrs["iteration"] = iteration + n
+
 
 class TempHDFBackend(object):
     def __enter__(self):
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+__all__ = ["CUDALogProb"]
+
+
+class CUDALogProb(object):
+    """Evaluate the log-probability of an ensemble using a CUDA kernel
+
+    This evaluates the log-probability for a set of walkers in a single launch
+    of a `Numba <https://numba.pydata.org>`_ CUDA kernel, with one thread per
+    walker. This can be a lot faster than calling ``log_prob_fn`` from Python
+    if the model is cheap and the ensemble is large.
+
+    .. note:: You must install `numba <https://numba.pydata.org>`_ and have a
+        CUDA capable GPU to use this.
+
+    Args:
+        kernel: A ``numba.cuda.jit`` kernel with the signature ``kernel(coords,
+            log_prob)`` where ``coords`` is the ``(nwalkers, ndim)`` device
+            array of positions and ``log_prob`` is the ``(nwalkers,)`` device
+            array to fill in. The kernel should compute the entry for walker
+            ``numba.cuda.grid(1)`` and return early when that is out of
+            bounds. If ``seed`` is given, the kernel is called as
+            ``kernel(coords, log_prob, rng_states)`` instead.
+        nwalkers (int): The size of the ensemble. This sets the number of
+            random number generator states.
+        threads_per_block (Optional[int]): The number of threads in each CUDA
+            block. (default: ``128``)
+        seed (Optional[int]): If the log-probability is stochastic, set this
+            to allocate one ``xoroshiro128p`` random number generator state
+            per walker (see ``numba.cuda.random``). These states are created
+            once and then reused, so the streams continue between steps.
+            (default: ``None``)
+
+    """
+
+    def __init__(self, kernel, nwalkers, threads_per_block=128, seed=None):
+        try:
+            from numba import cuda  # NOQA
+        except ImportError:
+            raise ImportError(
+                "you must install 'numba' to use CUDA log-probability "
+                "functions"
+            )
+        self.kernel = kernel
+        self.nwalkers = int(nwalkers)
+        self.threads_per_block = int(threads_per_block)
+        self.seed = seed
+        self._rng_states = None
+
+    def __getstate__(self):
+        # Device arrays can't be pickled so the states will be reinitialized
+        d = dict(self.__dict__)
+        d["_rng_states"] = None
+        return d
+
+    def __call__(self, coords):
+        from numba import cuda
+
+        n = len(coords)
+        stream = cuda.stream()
+        d_coords = cuda.to_device(
+            np.ascontiguousarray(coords, dtype=np.float64), stream=stream
+        )
+        d_log_prob = cuda.device_array(n, dtype=np.float64, stream=stream)
+        args = (d_coords, d_log_prob)
+        if self.seed is not None:
+            if self._rng_states is None or len(self._rng_states) < n:
+                from numba.cuda.random import create_xoroshiro128p_states
+
+                self._rng_states = create_xoroshiro128p_states(
+                    max(n, self.nwalkers), seed=self.seed, stream=stream
+                )
+            args += (self._rng_states,)
+
+        blocks = (n + self.threads_per_block - 1) // self.threads_per_block
+        self.kernel[blocks, self.threads_per_block, stream](*args)
+        log_prob = d_log_prob.copy_to_host(stream=stream)
+        stream.synchronize()
+        return log_prob
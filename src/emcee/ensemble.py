@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import functools
 import warnings
+import weakref
+from collections import namedtuple
 
 import numpy as np
 
 from .backends import Backend
+from .cuda import CUDALogProb
 from .model import Model
 from .moves import StretchMove
 from .pbar import get_progress_bar
@@ -13,12 +17,21 @@ from .utils import deprecated, deprecation_warning
 
 __all__ = ["EnsembleSampler"]
 
+# The layout of the blobs returned by ``log_prob_fn``: whether there are any,
+# their dtype, and the axes that need to be squeezed out.
+_BlobSpec = namedtuple("_BlobSpec", ("has_blobs", "dt", "axes", "scalar"))
+
 try:
     from collections.abc import Iterable
 except ImportError:
     # for py2.7, will be an Exception in 3.8
     from collections import Iterable
 
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
 
 class EnsembleSampler(object):
     """An ensemble MCMC sampler
@@ -44,7 +57,10 @@ class EnsembleSampler(object):
         pool (Optional): An object with a ``map`` method that follows the same
             calling sequence as the built-in ``map`` function. This is
             generally used to compute the log-probabilities for the ensemble
-            in parallel.
+            in parallel. If the pool also has an ``imap_unordered`` method
+            (like ``multiprocessing.Pool``), that will be used instead so
+            that tasks can be dispatched in chunks and load-balanced across
+            the workers.
         backend (Optional): Either a :class:`backends.Backend` or a subclass
             (like :class:`backends.HDFBackend`) that is used to store and
             serialize the state of the chain. By default, the chain is stored
@@ -54,6 +70,44 @@ class EnsembleSampler(object):
             to accept a list of position vectors instead of just one. Note
             that ``pool`` will be ignored if this is ``True``.
             (default: ``False``)
+        vectorize_chunks (Optional[int]): If set, ``log_prob_fn`` is expected
+            to accept a list of position vectors (as with ``vectorize``) and
+            it will be called on contiguous blocks of at most this many
+            walkers. This removes the per-walker Python call overhead for
+            cheap models while bounding the size of each call. The ``pool``
+            will be ignored if this is set. (default: ``None``)
+        pool_chunksize (Optional[int]): The number of walkers sent to a
+            worker in each task when the ``pool`` has an ``imap_unordered``
+            method. By default, this is computed from the number of processes
+            in the pool (if it is known) so that each worker gets about four
+            tasks per evaluation.
+        pool_shared_memory (Optional[bool]): If ``True`` and the ``pool`` has
+            an ``imap_unordered`` method, the coordinates are written to a
+            block of shared memory and only the walker indices are sent to
+            the workers instead of pickling every position. This requires
+            Python 3.8 or later and the workers must run on the same machine.
+            (default: ``False``)
+        nan_check_interval (Optional[int]): Check that ``log_prob_fn`` didn't
+            return NaN on every ``nan_check_interval``-th call to
+            :func:`compute_log_prob`. The first evaluation and the initial
+            state are always checked. Setting this to a value larger than
+            ``1`` removes a scan over the log-probabilities from most steps
+            but NaNs may then go undetected for a while. (default: ``1``)
+        cuda_log_prob_fn (Optional): A ``numba.cuda.jit`` kernel (or a
+            :class:`cuda.CUDALogProb` for more control) that computes the
+            log-probabilities of all the walkers in a single launch on the
+            GPU. If this is given, it is used instead of ``log_prob_fn``
+            (which can then be ``None``) and the model can't return blobs.
+            See :class:`cuda.CUDALogProb` for the required kernel signature.
+            (default: ``None``)
+        chain_dtype (Optional): The floating point type used by the backend
+            to store the chain (for example ``np.float32``). The sampler
+            always works in double precision, this only reduces the memory
+            and bandwidth needed to store long chains. The log-probabilities
+            are always stored in double precision. A ``ValueError`` is
+            raised for non-floating point types. This is ignored if the
+            ``backend`` has already been initialized. (default: ``None``,
+            meaning ``np.float64``)
 
     """
 
@@ -68,6 +122,12 @@ class EnsembleSampler(object):
         kwargs=None,
         backend=None,
         vectorize=False,
+        vectorize_chunks=None,
+        pool_chunksize=None,
+        pool_shared_memory=False,
+        nan_check_interval=1,
+        cuda_log_prob_fn=None,
+        chain_dtype=None,
         blobs_dtype=None,
         # Deprecated...
         a=None,
@@ -108,13 +168,47 @@ class EnsembleSampler(object):
         self._weights = np.atleast_1d(self._weights).astype(float)
         self._weights /= np.sum(self._weights)
 
+        # Cache what we need to choose a move on each step. With a single
+        # move there is nothing to choose; otherwise we sample from the
+        # cumulative weights directly instead of going through ``choice``.
+        self._single_move = self._moves[0] if len(self._moves) == 1 else None
+        self._cumweights = np.cumsum(self._weights)
+        self._cumweights /= self._cumweights[-1]
+
         self.pool = pool
+        self.pool_chunksize = pool_chunksize
+        if pool_shared_memory and shared_memory is None:
+            raise ImportError(
+                "'pool_shared_memory' requires multiprocessing.shared_memory "
+                "(Python 3.8 or later)"
+            )
+        self.pool_shared_memory = pool_shared_memory
+        self._shared_memory = None
         self.vectorize = vectorize
+        self.vectorize_chunks = vectorize_chunks
+        if vectorize_chunks is not None:
+            self.vectorize_chunks = int(vectorize_chunks)
+            if self.vectorize_chunks <= 0:
+                raise ValueError("Invalid vectorize_chunks argument")
         self.blobs_dtype = blobs_dtype
 
+        self._nan_check_interval = int(nan_check_interval)
+        if self._nan_check_interval <= 0:
+            raise ValueError("Invalid nan_check_interval argument")
+        self._nan_check_counter = 0
+        self._blob_spec = None
+
         self.ndim = ndim
         self.nwalkers = nwalkers
+        if chain_dtype is not None:
+            chain_dtype = Backend._get_chain_dtype(chain_dtype)
+        self.chain_dtype = chain_dtype
         self.backend = Backend() if backend is None else backend
+        self._results_buf = [None] * self.nwalkers
+
+        # Scratch space that moves supporting ``propose_into`` can fill in
+        # place instead of allocating new arrays on every step
+        self._scratch = dict(lnpdiff=np.empty(self.nwalkers, dtype=np.float64))
 
         # Deal with re-used backends
         if not self.backend.initialized:
@@ -150,6 +244,13 @@ class EnsembleSampler(object):
         # ``args`` and ``kwargs`` pickleable.
         self.log_prob_fn = _FunctionWrapper(log_prob_fn, args, kwargs)
 
+        # Evaluate the log-probability in a CUDA kernel if requested
+        if cuda_log_prob_fn is not None and not isinstance(
+            cuda_log_prob_fn, CUDALogProb
+        ):
+            cuda_log_prob_fn = CUDALogProb(cuda_log_prob_fn, self.nwalkers)
+        self.cuda_log_prob_fn = cuda_log_prob_fn
+
     @property
     def random_state(self):
         """
@@ -174,6 +275,34 @@ class EnsembleSampler(object):
         except:
             pass
 
+    def spawn_rngs(self, n):
+        """
+        Get ``n`` independent random number generators for parallel workers
+
+        The generators are ``numpy.random.Generator`` objects (using the
+        ``PCG64`` bit generator) seeded through a ``numpy.random.SeedSequence``
+        drawn from the internal random number generator of the sampler. This
+        means that they are reproducible given :attr:`random_state`, and that
+        the streams are statistically independent of each other, so they can
+        be handed to the workers of a ``pool`` when ``log_prob_fn`` needs
+        random numbers of its own.
+
+        .. note:: Each call draws from the sampler's own generator, so it
+            advances :attr:`random_state` and changes all of the proposals
+            that follow. Call it at the same point of a run to keep the chain
+            reproducible.
+
+        Args:
+            n (int): The number of generators (usually the size of the pool).
+
+        Returns:
+            list[numpy.random.Generator]: The independent generators.
+
+        """
+        entropy = self._random.randint(0, 2 ** 32, size=4, dtype=np.uint64)
+        seed_seq = np.random.SeedSequence([int(e) for e in entropy])
+        return [np.random.default_rng(s) for s in seed_seq.spawn(int(n))]
+
     @property
     def iteration(self):
         return self.backend.iteration
@@ -183,13 +312,23 @@ class EnsembleSampler(object):
         Reset the bookkeeping parameters
 
         """
-        self.backend.reset(self.nwalkers, self.ndim)
+        if self.chain_dtype is None:
+            self.backend.reset(self.nwalkers, self.ndim)
+        else:
+            self.backend.reset(
+                self.nwalkers, self.ndim, dtype=self.chain_dtype
+            )
 
     def __getstate__(self):
         # In order to be generally picklable, we need to discard the pool
         # object before trying.
         d = self.__dict__
         d["pool"] = None
+
+        # The shared memory block belongs to this process so it is never
+        # pickled; it will be re-created when it is next needed.
+        d = dict(d)
+        d["_shared_memory"] = None
         return d
 
     def sample(
@@ -205,6 +344,8 @@ class EnsembleSampler(object):
         thin=None,
         store=True,
         progress=False,
+        copy=True,
+        save_buffer=1,
     ):
         """Advance the chain as a generator
 
@@ -233,19 +374,30 @@ class EnsembleSampler(object):
             skip_initial_state_check (Optional[bool]): If ``True``, a check that
                 the initial_state can fully explore the space will be skipped.
                 (default: ``False``)
-
+            copy (Optional[bool]): If ``False``, the arrays in
+                ``initial_state`` are used directly instead of being copied
+                first, so they will be updated in place as the chain
+                advances. (default: ``True``)
+            save_buffer (Optional[int]): The number of saved steps to collect
+                in memory before writing them to the backend in a single call
+                to ``save_chunk``. This can be a lot faster with the
+                :class:`backends.HDFBackend`, but the backend will then lag up
+                to this many steps behind the yielded state and up to this
+                many steps can be lost if the process is killed. Any
+                remaining steps are written when the generator finishes or is
+                closed. (default: ``1``)
 
         Every ``thin_by`` steps, this generator yields the
         :class:`State` of the ensemble.
 
         """
         # Interpret the input as a walker state and check the dimensions.
-        state = State(initial_state, copy=True)
+        state = State(initial_state, copy=copy)
         if np.shape(state.coords) != (self.nwalkers, self.ndim):
             raise ValueError("incompatible input dimensions")
-        if (not skip_initial_state_check) and np.linalg.cond(
-            np.atleast_2d(np.cov(state.coords, rowvar=False))
-        ) > 1e8:
+        if (not skip_initial_state_check) and (
+            not _walkers_independent(state.coords)
+        ):
             warnings.warn(
                 "Initial state is not linearly independent and it will not "
                 "allow a full exploration of parameter space",
@@ -301,8 +453,8 @@ class EnsembleSampler(object):
             yield_step = 1
             checkpoint_step = thin
             iterations = int(iterations)
+            nsaves = iterations // checkpoint_step
             if store:
-                nsaves = iterations // checkpoint_step
                 self.backend.grow(nsaves, state.blobs)
 
         else:
@@ -314,8 +466,9 @@ class EnsembleSampler(object):
             yield_step = thin_by
             checkpoint_step = thin_by
             iterations = int(iterations)
+            nsaves = iterations
             if store:
-                self.backend.grow(iterations, state.blobs)
+                self.backend.grow(nsaves, state.blobs)
 
         # Set up a wrapper around the relevant model functions
         if self.pool is not None:
@@ -326,32 +479,86 @@ class EnsembleSampler(object):
             self.log_prob_fn, self.compute_log_prob, map_fn, self._random
         )
 
+        # Look up the methods used on every step once, outside of the loops
+        choose_move = self._choose_move
+        propose_fns = dict(
+            (id(m), _get_propose_fn(m, self._scratch)) for m in self._moves
+        )
+        get_random_state = self._random.get_state
+
+        # Optionally collect the saved steps in memory and write them to the
+        # backend in chunks. Whatever is left is written when the loop exits.
+        nbuffer = 0
+        if store and _can_replace(self.backend, "save_chunk", "save_step"):
+            nbuffer = min(int(save_buffer), nsaves)
+        saver = _SaveBuffer(self.backend, nbuffer if nbuffer > 1 else 0, state)
+        if nbuffer > 1:
+            save_step = saver.save_step
+        else:
+            save_step = self.backend.save_step
+
         # Inject the progress bar
         total = iterations * yield_step
-        with get_progress_bar(progress, total) as pbar:
-            i = 0
-            for _ in range(iterations):
-                for _ in range(yield_step):
-                    # Choose a random move
-                    move = self._random.choice(self._moves, p=self._weights)
-
-                    # Propose
-                    state, accepted = move.propose(model, state)
-                    state.random_state = self.random_state
-
+        with get_progress_bar(progress, total) as pbar, saver:
+            # Skip the call entirely when there is no progress bar to update
+            update = pbar.update if progress else None
+            if checkpoint_step == 1:
+                # Without thinning every step is saved and yielded, so we can
+                # skip the bookkeeping needed for the general case below.
+                for _ in range(iterations):
+                    move = choose_move()
+                    state, accepted = propose_fns[id(move)](model, state)
                     if tune:
                         move.tune(state, accepted)
 
-                    # Save the new step
-                    if store and (i + 1) % checkpoint_step == 0:
-                        self.backend.save_step(state, accepted)
+                    # The random state is only recorded when it can be
+                    # observed because getting it is expensive.
+                    state.random_state = get_random_state()
+                    if store:
+                        save_step(state, accepted)
 
-                    pbar.update(1)
-                    i += 1
+                    if update is not None:
+                        update(1)
+                    yield state
 
-                # Yield the result as an iterator so that the user can do all
-                # sorts of fun stuff with the results so far.
-                yield state
+            else:
+                i = 0
+                for _ in range(iterations):
+                    for _ in range(yield_step):
+                        # Choose a random move
+                        move = choose_move()
+
+                        # Propose
+                        state, accepted = propose_fns[id(move)](model, state)
+
+                        if tune:
+                            move.tune(state, accepted)
+
+                        # Save the new step. The random state is only
+                        # recorded when it can be observed (here and when
+                        # yielding) because getting it is expensive.
+                        if store and (i + 1) % checkpoint_step == 0:
+                            state.random_state = get_random_state()
+                            save_step(state, accepted)
+
+                        if update is not None:
+                            update(1)
+                        i += 1
+
+                    # Yield the result as an iterator so that the user can do
+                    # all sorts of fun stuff with the results so far.
+                    state.random_state = get_random_state()
+                    yield state
+
+    def _choose_move(self):
+        # Choose a random move using the cached cumulative weights
+        if self._single_move is not None:
+            return self._single_move
+        return self._moves[
+            np.searchsorted(
+                self._cumweights, self._random.random_sample(), side="right"
+            )
+        ]
 
     def run_mcmc(self, initial_state, nsteps, **kwargs):
         """
@@ -402,57 +609,193 @@ class EnsembleSampler(object):
         """
         p = coords
 
-        # Check that the parameters are in physical ranges.
-        if np.any(np.isinf(p)):
-            raise ValueError("At least one parameter value was infinite")
-        if np.any(np.isnan(p)):
+        # Check that the parameters are in physical ranges. This is a single
+        # pass over the coordinates and we only work out what went wrong if
+        # the check fails.
+        if not np.isfinite(p).all():
+            if np.any(np.isinf(p)):
+                raise ValueError("At least one parameter value was infinite")
             raise ValueError("At least one parameter value was NaN")
 
         # Run the log-probability calculations (optionally in parallel).
-        if self.vectorize:
-            results = self.log_prob_fn(p)
+        if self.cuda_log_prob_fn is not None:
+            log_prob, blob = self.cuda_log_prob_fn(p), None
         else:
-            # If the `pool` property of the sampler has been set (i.e. we want
-            # to use `multiprocessing`), use the `pool`'s map method.
-            # Otherwise, just use the built-in `map` function.
-            if self.pool is not None:
-                map_func = self.pool.map
+            if self.vectorize_chunks is not None:
+                k = self.vectorize_chunks
+                results = []
+                for i in range(0, len(p), k):
+                    results.extend(self.log_prob_fn(p[i : i + k]))
+            elif self.vectorize:
+                results = self.log_prob_fn(p)
             else:
-                map_func = map
-            results = list(
-                map_func(self.log_prob_fn, (p[i] for i in range(len(p))))
-            )
+                results = self._map_log_prob(p)
 
-        try:
-            log_prob = np.array([float(l[0]) for l in results])
-            blob = [l[1:] for l in results]
-        except (IndexError, TypeError):
-            log_prob = np.array([float(l) for l in results])
-            blob = None
-        else:
-            # Get the blobs dtype
-            if self.blobs_dtype is not None:
-                dt = self.blobs_dtype
-            else:
-                try:
-                    dt = np.atleast_1d(blob[0]).dtype
-                except ValueError:
-                    dt = np.dtype("object")
-            blob = np.array(blob, dtype=dt)
-
-            # Deal with single blobs properly
-            shape = blob.shape[1:]
-            if len(shape):
-                axes = np.arange(len(shape))[np.array(shape) == 1] + 1
-                if len(axes):
-                    blob = np.squeeze(blob, tuple(axes))
+            log_prob, blob = self._unpack_results(results)
 
         # Check for log_prob returning NaN.
-        if np.any(np.isnan(log_prob)):
+        check_nan = self._nan_check_counter % self._nan_check_interval == 0
+        self._nan_check_counter += 1
+        if check_nan and np.any(np.isnan(log_prob)):
             raise ValueError("Probability function returned NaN")
 
         return log_prob, blob
 
+    def _unpack_results(self, results):
+        # Split the per-walker results into the log-probabilities and blobs
+        n = len(results)
+        spec = self._blob_spec
+        if spec is None:
+            # This is the first evaluation so we need to work out whether or
+            # not there are blobs and how they should be packed. This doesn't
+            # change between steps so we cache the result.
+            try:
+                log_prob = np.fromiter(
+                    (float(l[0]) for l in results), dtype=np.float64, count=n
+                )
+                blob = [l[1:] for l in results]
+            except (IndexError, TypeError):
+                log_prob = np.fromiter(
+                    (float(l) for l in results), dtype=np.float64, count=n
+                )
+                blob = None
+                spec = _BlobSpec(False, None, (), False)
+            else:
+                # Get the blobs dtype
+                if self.blobs_dtype is not None:
+                    dt = self.blobs_dtype
+                else:
+                    try:
+                        dt = np.atleast_1d(blob[0]).dtype
+                    except ValueError:
+                        dt = np.dtype("object")
+                blob = np.array(blob, dtype=dt)
+
+                # Deal with single blobs properly
+                shape = blob.shape[1:]
+                axes = ()
+                if len(shape):
+                    axes = np.arange(len(shape))[np.array(shape) == 1] + 1
+                    axes = tuple(int(a) for a in axes)
+                if axes:
+                    blob = np.squeeze(blob, axes)
+
+                # A single numerical blob per walker can be read directly
+                # without going through the generic conversion in np.array
+                dt = np.dtype(dt)
+                scalar = (
+                    shape == (1,) and dt.fields is None and dt.kind in "biufc"
+                )
+                spec = _BlobSpec(True, dt, axes, scalar)
+            self._blob_spec = spec
+
+        elif spec.scalar:
+            log_prob = np.fromiter(
+                (float(l[0]) for l in results), dtype=np.float64, count=n
+            )
+            blob = np.fromiter((l[1] for l in results), dtype=spec.dt, count=n)
+
+        elif spec.has_blobs:
+            log_prob = np.fromiter(
+                (float(l[0]) for l in results), dtype=np.float64, count=n
+            )
+            blob = np.array([l[1:] for l in results], dtype=spec.dt)
+            if spec.axes:
+                blob = np.squeeze(blob, spec.axes)
+
+        else:
+            log_prob = np.fromiter(
+                (float(l) for l in results), dtype=np.float64, count=n
+            )
+            blob = None
+
+        return log_prob, blob
+
+    def _map_log_prob(self, p):
+        # If the `pool` property of the sampler has been set (i.e. we want to
+        # use `multiprocessing`), use the `pool`'s map method. Otherwise, just
+        # use the built-in `map` function.
+        results = self._get_results_buffer(len(p))
+        if self.pool is not None and hasattr(self.pool, "imap_unordered"):
+            self._pool_imap(p, results)
+            return results
+
+        if self.pool is not None:
+            map_func = self.pool.map
+        else:
+            map_func = map
+
+        # Iterating over ``p`` directly gives the walkers one by one
+        i = -1
+        for i, result in enumerate(map_func(self.log_prob_fn, p)):
+            results[i] = result
+        if i + 1 != len(p):
+            raise ValueError("the pool returned the wrong number of results")
+        return results
+
+    def _get_results_buffer(self, n):
+        # The list of per-walker results is reused between calls, so it only
+        # needs to be reallocated when the number of walkers changes (the
+        # moves call this on sub-ensembles of a fixed size).
+        if len(self._results_buf) != n:
+            self._results_buf = [None] * n
+        return self._results_buf
+
+    def _pool_imap(self, p, results):
+        # Dispatch the walkers to the pool in chunks and in whatever order the
+        # workers finish, tagging each task with its index so that the
+        # results can be put back in order.
+        chunksize = self.pool_chunksize
+        if chunksize is None:
+            nproc = getattr(self.pool, "_processes", None)
+            if nproc:
+                chunksize = max(1, len(p) // (4 * nproc))
+            else:
+                chunksize = 1
+
+        # If requested, pass the coordinates through shared memory so that
+        # only the indices need to be sent to the workers.
+        shared = (
+            self.pool_shared_memory
+            and len(p) <= self.nwalkers
+            and np.shape(p)[1:] == (self.ndim,)
+        )
+        if shared:
+            name = self._get_shared_memory().name
+            coords = _shared_arrays[name]
+            coords[: len(p)] = p
+            f = _SharedMemoryFunctionWrapper(
+                self.log_prob_fn, name, coords.shape
+            )
+            tasks = range(len(p))
+        else:
+            f = _IndexedFunctionWrapper(self.log_prob_fn)
+            tasks = enumerate(p)
+
+        count = 0
+        for i, result in self.pool.imap_unordered(
+            f, tasks, chunksize=int(chunksize)
+        ):
+            results[i] = result
+            count += 1
+        if count != len(p):
+            raise ValueError("the pool returned the wrong number of results")
+
+    def _get_shared_memory(self):
+        # Lazily allocate the shared memory block for the coordinates. It is
+        # released when the sampler is garbage collected.
+        if self._shared_memory is None:
+            shape = (self.nwalkers, self.ndim)
+            shm = shared_memory.SharedMemory(
+                create=True, size=8 * self.nwalkers * self.ndim
+            )
+            _shared_arrays[shm.name] = np.ndarray(
+                shape, dtype=np.float64, buffer=shm.buf
+            )
+            weakref.finalize(self, _release_shared_memory, shm)
+            self._shared_memory = shm
+        return self._shared_memory
+
     @property
     def acceptance_fraction(self):
         """The fraction of proposed steps that were accepted"""
@@ -524,11 +867,107 @@ class EnsembleSampler(object):
     get_autocorr_time.__doc__ = Backend.get_autocorr_time.__doc__
 
 
+def _can_replace(obj, name, base_name):
+    # Check if ``obj`` has a method ``name`` that can be used in place of
+    # ``base_name``. This is not the case if ``base_name`` was overridden
+    # further down the class hierarchy than ``name`` because that override is
+    # what should be called instead.
+    mro = type(obj).__mro__
+    cls = next((c for c in mro if name in vars(c)), None)
+    base_cls = next((c for c in mro if base_name in vars(c)), None)
+    if cls is None:
+        return False
+    return base_cls is None or issubclass(cls, base_cls)
+
+
+def _get_propose_fn(move, scratch):
+    # Use the ``propose_into`` method of the move with the sampler's scratch
+    # space if it has one.
+    if _can_replace(move, "propose_into", "propose"):
+        return functools.partial(move.propose_into, scratch=scratch)
+    return move.propose
+
+
+class _SaveBuffer(object):
+    """
+    Collect the saved steps in memory so that they can be written to the
+    backend in chunks. Any remaining steps are written on exit.
+
+    """
+
+    def __init__(self, backend, size, state):
+        self.backend = backend
+        nwalkers = len(state.coords)
+        self.coords = np.empty((size,) + np.shape(state.coords))
+        self.log_prob = np.empty((size, nwalkers))
+        self.accepted = np.empty((size, nwalkers), dtype=bool)
+        self.blobs = None
+        if state.blobs is not None:
+            self.blobs = np.empty(
+                (size,) + state.blobs.shape, dtype=state.blobs.dtype
+            )
+        self.random_state = None
+        self.count = 0
+
+    def save_step(self, state, accepted):
+        if (state.blobs is None) != (self.blobs is None):
+            raise ValueError("inconsistent use of blobs")
+        if state.coords.shape != self.coords.shape[1:]:
+            raise ValueError("invalid coordinate dimensions")
+
+        i = self.count
+        self.coords[i] = state.coords
+        self.log_prob[i] = state.log_prob
+        self.accepted[i] = accepted
+        if self.blobs is not None:
+            self.blobs[i] = state.blobs
+        self.random_state = state.random_state
+        self.count += 1
+
+        if self.count == len(self.coords):
+            self.flush()
+
+    def flush(self):
+        n = self.count
+        if n == 0:
+            return
+        self.count = 0
+        self.backend.save_chunk(
+            self.coords[:n],
+            self.log_prob[:n],
+            self.accepted[:n],
+            blobs=None if self.blobs is None else self.blobs[:n],
+            random_state=self.random_state,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.flush()
+
+
+def _walkers_independent(coords):
+    # This is equivalent to requiring that the condition number of the
+    # covariance of the walkers is at most 1e8, but it works with the
+    # singular values of the centered coordinates directly instead of forming
+    # the covariance matrix first.
+    if not np.all(np.isfinite(coords)):
+        # This will be caught (with a better error message) later
+        return True
+    x = coords - np.mean(coords, axis=0)
+    s = np.linalg.svd(x, compute_uv=False)
+    return s[-1] > 1e-4 * s[0]
+
+
 class _FunctionWrapper(object):
     """
     This is a hack to make the likelihood function pickleable when ``args``
     or ``kwargs`` are also included.
 
+    The ``args`` and ``kwargs`` are kept by reference and unpacked on every
+    call, so changes to them are seen by later evaluations.
+
     """
 
     def __init__(self, f, args, kwargs):
@@ -538,6 +977,9 @@ class _FunctionWrapper(object):
 
     def __call__(self, x):
         try:
+            # Skip the unpacking in the common case with no extra arguments
+            if len(self.args) == 0 and len(self.kwargs) == 0:
+                return self.f(x)
             return self.f(x, *self.args, **self.kwargs)
         except:  # pragma: no cover
             import traceback
@@ -549,3 +991,66 @@ class _FunctionWrapper(object):
             print("  exception:")
             traceback.print_exc()
             raise
+
+
+class _IndexedFunctionWrapper(object):
+    """
+    A pickleable wrapper that calls ``f`` on the position in an ``(index,
+    position)`` task and returns ``(index, result)``.
+
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, task):
+        i, x = task
+        return i, self.f(x)
+
+
+# The arrays backed by shared memory blocks in this process, keyed by the name
+# of the block, and the blocks that a worker has attached to
+_shared_arrays = {}
+_attached_memory = {}
+
+
+def _release_shared_memory(shm):
+    _shared_arrays.pop(shm.name, None)
+    shm.close()
+    shm.unlink()
+
+
+def _get_shared_array(name, shape):
+    try:
+        return _shared_arrays[name]
+    except KeyError:
+        pass
+
+    # This is a worker that hasn't seen this block before. The block is owned
+    # (and will be unlinked) by the sampler so it shouldn't be tracked here.
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 doesn't have the ``track`` argument
+        shm = shared_memory.SharedMemory(name=name)
+        if getattr(shared_memory, "_USE_POSIX", False):
+            resource_tracker.unregister(shm._name, "shared_memory")
+    _attached_memory[name] = shm
+    _shared_arrays[name] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    return _shared_arrays[name]
+
+
+class _SharedMemoryFunctionWrapper(object):
+    """
+    A pickleable wrapper that calls ``f`` on the position of walker ``i`` from
+    a block of shared memory and returns ``(i, result)``.
+
+    """
+
+    def __init__(self, f, name, shape):
+        self.f = f
+        self.name = name
+        self.shape = shape
+
+    def __call__(self, i):
+        return i, self.f(_get_shared_array(self.name, self.shape)[i])
@@ -42,6 +42,14 @@ class MHMove(Move):
                 subset of walkers.
             random: A numpy-compatible random number state.
 
+        """
+        return self.propose_into(model, state, None)
+
+    def propose_into(self, model, state, scratch):
+        """Like :func:`propose` but using preallocated scratch buffers
+
+        See :func:`RedBlueMove.propose_into` for the meaning of ``scratch``.
+
         """
         # Check to make sure that the dimensions match.
         nwalkers, ndim = state.coords.shape
@@ -55,7 +63,9 @@ class MHMove(Move):
         new_log_probs, new_blobs = model.compute_log_prob_fn(q)
 
         # Loop over the walkers and update them accordingly.
-        lnpdiff = new_log_probs - state.log_prob + factors
+        lnpdiff = self._scratch_buffer(scratch, "lnpdiff", (nwalkers,))
+        np.subtract(new_log_probs, state.log_prob, out=lnpdiff)
+        lnpdiff += factors
         accepted = np.log(model.random.rand(nwalkers)) < lnpdiff
 
         # Update the parameters
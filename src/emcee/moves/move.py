@@ -9,6 +9,16 @@ class Move(object):
     def tune(self, state, accepted):
         pass
 
+    @staticmethod
+    def _scratch_buffer(scratch, name, shape, dtype=np.float64):
+        # Get a buffer from the sampler's scratch space that can be filled in
+        # place, or a new array if it isn't available or doesn't fit.
+        if scratch is not None:
+            buf = scratch.get(name)
+            if buf is not None and buf.shape == shape and buf.dtype == dtype:
+                return buf
+        return np.empty(shape, dtype=dtype)
+
     def update(self, old_state, new_state, accepted, subset=None):
         """Update a given subset of the ensemble with an accepted proposal
 
@@ -59,6 +59,24 @@ class RedBlueMove(Move):
                 subset of walkers.
             random: A numpy-compatible random number state.
 
+        """
+        return self.propose_into(model, state, None)
+
+    def propose_into(self, model, state, scratch):
+        """Like :func:`propose` but using preallocated scratch buffers
+
+        Args:
+            model: The sampler's model.
+            state: The current :class:`State` of the ensemble.
+            scratch: A dictionary of arrays owned by the sampler that are
+                filled in place instead of allocating new ones on each step.
+                The ``lnpdiff`` (float) entry with one element per walker is
+                used if it exists. This can be ``None``.
+
+        The returned acceptance array is always a new array because the
+        sampler passes it on to the backend and to :func:`Move.tune`, which
+        may keep it.
+
         """
         # Check that the dimensions are compatible.
         nwalkers, ndim = state.coords.shape
@@ -74,6 +92,7 @@ class RedBlueMove(Move):
 
         # Split the ensemble in half and iterate over these two halves.
         accepted = np.zeros(nwalkers, dtype=bool)
+        lnpdiff_buf = self._scratch_buffer(scratch, "lnpdiff", (nwalkers,))
         all_inds = np.arange(nwalkers)
         inds = all_inds % self.nsplits
         if self.randomize_split:
@@ -92,13 +111,13 @@ class RedBlueMove(Move):
             # Compute the lnprobs of the proposed position.
             new_log_probs, new_blobs = model.compute_log_prob_fn(q)
 
-            # Loop over the walkers and update them accordingly.
-            for i, (j, f, nlp) in enumerate(
-                zip(all_inds[S1], factors, new_log_probs)
-            ):
-                lnpdiff = f + nlp - state.log_prob[j]
-                if lnpdiff > np.log(model.random.rand()):
-                    accepted[j] = True
+            # Accept or reject all the walkers in this half at once. This
+            # uses the random numbers in the same order as doing it walker by
+            # walker would.
+            lnpdiff = lnpdiff_buf[: len(s)]
+            np.add(factors, new_log_probs, out=lnpdiff)
+            lnpdiff -= state.log_prob[S1]
+            accepted[S1] = lnpdiff > np.log(model.random.rand(len(s)))
 
             new_state = State(q, log_prob=new_log_probs, blobs=new_blobs)
             state = self.update(state, new_state, accepted, S1)
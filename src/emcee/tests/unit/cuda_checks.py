@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# Checks for the CUDA log-probability path. These are run by test_cuda.py in
+# a separate process with numba's CUDA simulator enabled, so this module
+# should only be imported there.
+
+import numpy as np
+from numba import cuda
+from numba.cuda.random import xoroshiro128p_uniform_float64
+
+from emcee import EnsembleSampler
+from emcee.cuda import CUDALogProb
+
+__all__ = ["check_log_prob", "check_chain", "check_rng_states"]
+
+
+def normal_log_prob(params):
+    return -0.5 * np.sum(params ** 2)
+
+
+@cuda.jit
+def normal_log_prob_kernel(coords, log_prob):
+    i = cuda.grid(1)
+    if i >= coords.shape[0]:
+        return
+    value = 0.0
+    for j in range(coords.shape[1]):
+        value += coords[i, j] ** 2
+    log_prob[i] = -0.5 * value
+
+
+@cuda.jit
+def uniform_kernel(coords, log_prob, rng_states):
+    i = cuda.grid(1)
+    if i >= coords.shape[0]:
+        return
+    log_prob[i] = xoroshiro128p_uniform_float64(rng_states, i)
+
+
+def check_log_prob(nwalkers=32, ndim=3, seed=1234):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler = EnsembleSampler(
+        nwalkers, ndim, None, cuda_log_prob_fn=normal_log_prob_kernel
+    )
+    assert isinstance(sampler.cuda_log_prob_fn, CUDALogProb)
+
+    log_prob, blobs = sampler.compute_log_prob(coords)
+    assert blobs is None
+    assert np.allclose(log_prob, [normal_log_prob(p) for p in coords])
+
+
+def check_chain(nwalkers=32, ndim=3, nsteps=10, seed=1234):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+
+    sampler1 = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    sampler1.random_state = np.random.get_state()
+    sampler1.run_mcmc(coords, nsteps)
+
+    sampler2 = EnsembleSampler(
+        nwalkers, ndim, None, cuda_log_prob_fn=normal_log_prob_kernel
+    )
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler2.random_state = np.random.get_state()
+    sampler2.run_mcmc(coords, nsteps)
+
+    assert np.allclose(sampler1.get_chain(), sampler2.get_chain())
+    assert np.allclose(sampler1.get_log_prob(), sampler2.get_log_prob())
+    assert np.allclose(
+        sampler1.acceptance_fraction, sampler2.acceptance_fraction
+    )
+
+
+def check_rng_states(nwalkers=32, ndim=3, seed=1234):
+    coords = np.random.randn(nwalkers // 2, ndim)
+
+    # The states are allocated for the full ensemble even when called on a
+    # sub-ensemble and then reused so that the streams continue
+    fn = CUDALogProb(uniform_kernel, nwalkers, seed=seed)
+    first = fn(coords)
+    states = fn._rng_states
+    assert len(states) == nwalkers
+    second = fn(coords)
+    assert fn._rng_states is states
+    assert np.all((0 <= first) & (first < 1))
+    assert not np.allclose(first, second)
+
+    # The draws are reproducible given the seed
+    fn2 = CUDALogProb(uniform_kernel, nwalkers, seed=seed)
+    assert np.allclose(fn2(coords), first)
+
+    # Evaluating the full ensemble doesn't need new states either
+    states = fn2._rng_states
+    assert len(fn2(np.random.randn(nwalkers, ndim))) == nwalkers
+    assert fn2._rng_states is states
+
+    # The device arrays are dropped when pickling
+    assert fn2.__getstate__()["_rng_states"] is None
@@ -132,6 +132,120 @@ def test_backend(backend, dtype, blobs):
         assert np.allclose(a, b), "inconsistent acceptance fraction"
 
 
+@pytest.mark.parametrize(
+    "backend,dtype,blobs", product(all_backends, dtypes, [True, False])
+)
+def test_save_buffer(backend, dtype, blobs, nsteps=10):
+    lp = normal_log_prob_blobs if blobs else normal_log_prob
+
+    # Unbuffered writes as the reference
+    sampler1 = run_sampler(backends.Backend(), nsteps=0, dtype=dtype, lp=lp)
+    for _ in sampler1.sample(
+        np.random.randn(32, 3), iterations=nsteps, save_buffer=1
+    ):
+        pass
+
+    with backend() as be:
+        sampler2 = run_sampler(be, nsteps=0, dtype=dtype, lp=lp)
+
+        # Stop part way through a buffered run; the partial buffer must
+        # still be written when the generator is closed
+        np.random.seed(1234)
+        np.random.randn(32, 3)
+        sampler2.random_state = np.random.get_state()
+        gen = sampler2.sample(
+            np.random.randn(32, 3), iterations=nsteps, save_buffer=4
+        )
+        for i, _ in enumerate(gen):
+            if i == nsteps - 4:
+                break
+        gen.close()
+        assert sampler2.iteration == nsteps - 3
+
+        values = ["chain", "log_prob"]
+        if blobs:
+            values += ["blobs"]
+        for k in values:
+            a = getattr(sampler1, "get_" + k)()[: nsteps - 3]
+            b = getattr(sampler2, "get_" + k)()
+            _custom_allclose(a, b)
+
+
+class _StepCountingBackend(backends.Backend):
+    def reset(self, *args, **kwargs):
+        self.nsaved = 0
+        super(_StepCountingBackend, self).reset(*args, **kwargs)
+
+    def save_step(self, state, accepted):
+        self.nsaved += 1
+        super(_StepCountingBackend, self).save_step(state, accepted)
+
+
+def test_save_buffer_override():
+    # A custom ``save_step`` must not be bypassed by the chunked writes
+    be = _StepCountingBackend()
+    run_sampler(be, nsteps=10)
+    assert be.nsaved == 10
+
+
+class _AcceptanceHistoryBackend(backends.Backend):
+    def reset(self, *args, **kwargs):
+        self.history = []
+        super(_AcceptanceHistoryBackend, self).reset(*args, **kwargs)
+
+    def save_step(self, state, accepted):
+        self.history.append(accepted)
+        super(_AcceptanceHistoryBackend, self).save_step(state, accepted)
+
+
+def test_accepted_not_reused():
+    # Backends may keep the acceptance arrays so they must not be overwritten
+    # by later steps
+    be = _AcceptanceHistoryBackend()
+    run_sampler(be, nsteps=10)
+    assert np.allclose(np.sum(be.history, axis=0), be.accepted)
+
+
+@pytest.mark.parametrize("backend", all_backends)
+def test_chain_dtype(backend, nwalkers=32, ndim=3, nsteps=10):
+    sampler1 = run_sampler(backends.Backend(), nsteps=nsteps)
+    chain1 = sampler1.get_chain()
+
+    with backend() as be:
+        np.random.seed(1234)
+        coords = np.random.randn(nwalkers, ndim)
+        sampler2 = EnsembleSampler(
+            nwalkers,
+            ndim,
+            normal_log_prob_blobs,
+            backend=be,
+            chain_dtype=np.float32,
+        )
+        sampler2.run_mcmc(coords, nsteps)
+
+        # The sampling itself is still done in double precision
+        chain2 = sampler2.get_chain()
+        assert chain2.dtype == np.float32
+        assert np.all(chain2 == chain1.astype(np.float32))
+        assert sampler2.get_log_prob().dtype == np.float64
+        assert np.allclose(sampler2.get_log_prob(), sampler1.get_log_prob())
+
+        # Resuming starts from a double precision state
+        last = sampler2.get_last_sample()
+        assert last.coords.dtype == np.float64
+        sampler2.run_mcmc(None, nsteps)
+        assert sampler2.get_chain().shape == (2 * nsteps, nwalkers, ndim)
+        assert sampler2.get_chain().dtype == np.float32
+
+        # Integer types would silently truncate the chain
+        with pytest.raises(ValueError):
+            EnsembleSampler(
+                nwalkers, ndim, normal_log_prob, backend=be, chain_dtype=int
+            )
+        with pytest.raises(ValueError):
+            be.reset(nwalkers, ndim, dtype=int)
+
+
 @pytest.mark.parametrize("backend,dtype", product(other_backends, dtypes))
 def test_reload(backend, dtype):
     with backend() as backend1:
@@ -22,6 +22,8 @@ class BlobLogProb(object):
     [
         (True, 5, lambda x: np.random.randn(5)),
         (True, 0, lambda x: np.random.randn()),
+        (True, 0, lambda x: int(x[0] > 0)),
+        (True, 2, lambda x: (x[0], x[1])),
         (False, 2, lambda x: (1.0, np.random.randn(3))),
         (False, 0, lambda x: "face"),
         (False, 2, lambda x: (np.random.randn(5), "face")),
@@ -49,3 +51,20 @@ def test_blob_shape(backend, blob_spec):
             shape += [blob_spec[1]]
 
         assert sampler.get_blobs().shape == tuple(shape)
+
+
+@pytest.mark.parametrize("backend", backends.get_test_backends())
+def test_scalar_blob_values(backend):
+    with backend() as be:
+        np.random.seed(42)
+
+        model = BlobLogProb(lambda x: x[0])
+        coords = np.random.randn(32, 3)
+        nwalkers, ndim = coords.shape
+
+        sampler = EnsembleSampler(nwalkers, ndim, model, backend=be)
+        sampler.run_mcmc(coords, 10)
+
+        blobs = sampler.get_blobs()
+        assert blobs.dtype == np.float64
+        assert np.all(blobs == sampler.get_chain()[:, :, 0])
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+__all__ = ["test_cuda"]
+
+
+@pytest.mark.parametrize(
+    "check", ["check_log_prob", "check_chain", "check_rng_states"]
+)
+def test_cuda(check):
+    pytest.importorskip("numba")
+
+    # The CUDA simulator lets these run without a GPU, but it has to be
+    # enabled before numba is imported so each check runs in a new process
+    env = dict(os.environ, NUMBA_ENABLE_CUDASIM="1")
+    code = "from emcee.tests.unit.cuda_checks import {0}; {0}()".format(check)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, result.stdout
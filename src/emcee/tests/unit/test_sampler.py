@@ -2,6 +2,8 @@
 
 import pickle
 from itertools import product
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 import pytest
@@ -84,6 +86,33 @@ def test_shapes(backend, moves, nwalkers=32, ndim=3, nsteps=10, seed=1234):
         ), "incorrect probability dimensions"
 
 
+class _CountingMove(moves.StretchMove):
+    def __init__(self, *args, **kwargs):
+        self.count = 0
+        super(_CountingMove, self).__init__(*args, **kwargs)
+
+    def propose(self, model, state):
+        self.count += 1
+        return super(_CountingMove, self).propose(model, state)
+
+
+def test_move_weights(nwalkers=32, ndim=3, nsteps=50, seed=1234):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    m1, m2, m3 = _CountingMove(), _CountingMove(), _CountingMove()
+    sampler = EnsembleSampler(
+        nwalkers,
+        ndim,
+        normal_log_prob,
+        moves=[(m1, 0.0), (m2, 0.5), (m3, 0.5)],
+    )
+    sampler.run_mcmc(coords, nsteps)
+    assert m1.count == 0
+    assert m2.count > 0
+    assert m3.count > 0
+    assert m2.count + m3.count == nsteps
+
+
 @pytest.mark.parametrize("backend", all_backends)
 def test_errors(backend, nwalkers=32, ndim=3, nsteps=5, seed=1234):
     # Set up the random number generator.
@@ -129,6 +158,46 @@ def test_errors(backend, nwalkers=32, ndim=3, nsteps=5, seed=1234):
             assert len(recorded_warnings) == 0
 
 
+def test_invalid_coords(nwalkers=32, ndim=3):
+    sampler = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler.compute_log_prob(coords)
+
+    coords[0, 1] = np.nan
+    with pytest.raises(ValueError, match="NaN"):
+        sampler.compute_log_prob(coords)
+
+    coords[1, 0] = -np.inf
+    with pytest.raises(ValueError, match="infinite"):
+        sampler.compute_log_prob(coords)
+
+
+def test_nan_check_interval(nwalkers=32, ndim=3):
+    coords = np.random.randn(nwalkers, ndim)
+    calls = []
+
+    def nan_after_first(params):
+        if len(calls) >= nwalkers:
+            return np.nan
+        calls.append(params)
+        return normal_log_prob(params)
+
+    sampler = EnsembleSampler(nwalkers, ndim, nan_after_first)
+    with pytest.raises(ValueError):
+        sampler.run_mcmc(coords, 5)
+
+    del calls[:]
+    sampler = EnsembleSampler(
+        nwalkers, ndim, nan_after_first, nan_check_interval=10
+    )
+    sampler.run_mcmc(coords, 4)
+    with pytest.raises(ValueError):
+        sampler.run_mcmc(None, 1)
+
+    with pytest.raises(ValueError):
+        EnsembleSampler(nwalkers, ndim, normal_log_prob, nan_check_interval=0)
+
+
 def run_sampler(
     backend,
     nwalkers=32,
@@ -214,6 +283,72 @@ def test_restart(backend):
         sampler.run_mcmc(None, 10)
 
 
+@pytest.mark.parametrize("backend", all_backends)
+def test_resume(backend, nwalkers=32, ndim=3, nsteps=10):
+    with backend() as be:
+        sampler1 = run_sampler(be, nwalkers=nwalkers, ndim=ndim, nsteps=nsteps)
+        chain = np.array(sampler1.get_chain())
+
+        # Resuming from a re-used backend must not touch the stored chain
+        sampler2 = EnsembleSampler(
+            nwalkers, ndim, normal_log_prob, backend=be
+        )
+        sampler2.run_mcmc(None, nsteps)
+        assert np.allclose(sampler2.get_chain()[:nsteps], chain)
+
+        # Nor the state that was returned by the previous call
+        state = sampler2.run_mcmc(None, 2)
+        coords = np.array(state.coords)
+        state2 = sampler2.run_mcmc(None, 2)
+        assert state2.coords is not state.coords
+        assert np.all(state.coords == coords)
+        assert np.allclose(state2.coords, sampler2.get_last_sample().coords)
+
+
+def _scaled_log_prob(params, scale, offset=0.0):
+    return -0.5 * np.sum(((params - offset) / scale) ** 2)
+
+
+def test_args_kwargs(nwalkers=32, ndim=3, nsteps=10, seed=1234):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler = EnsembleSampler(
+        nwalkers,
+        ndim,
+        _scaled_log_prob,
+        args=(2.0,),
+        kwargs=dict(offset=1.0),
+    )
+    sampler.run_mcmc(coords, nsteps)
+    expect = [_scaled_log_prob(p, 2.0, offset=1.0) for p in coords]
+    assert np.allclose(sampler.compute_log_prob(coords)[0], expect)
+
+    # The wrapped function must still be pickleable
+    sampler2 = pickle.loads(pickle.dumps(sampler, -1))
+    assert np.allclose(sampler2.compute_log_prob(coords)[0], expect)
+
+    # Changes to the arguments are seen by later calls
+    args, kwargs = [2.0], dict(offset=1.0)
+    sampler = EnsembleSampler(
+        nwalkers, ndim, _scaled_log_prob, args=args, kwargs=kwargs
+    )
+    args[0] = 3.0
+    kwargs["offset"] = -1.0
+    expect = [_scaled_log_prob(p, 3.0, offset=-1.0) for p in coords]
+    assert np.allclose(sampler.compute_log_prob(coords)[0], expect)
+
+    sampler.log_prob_fn.args = [4.0]
+    sampler.log_prob_fn.kwargs = {}
+    expect = [_scaled_log_prob(p, 4.0) for p in coords]
+    assert np.allclose(sampler.compute_log_prob(coords)[0], expect)
+
+    # The arguments can also be given as an array
+    for args in (np.array([2.0]), np.array([2.0, 1.0])):
+        sampler = EnsembleSampler(nwalkers, ndim, _scaled_log_prob, args=args)
+        expect = [_scaled_log_prob(p, *args) for p in coords]
+        assert np.allclose(sampler.compute_log_prob(coords)[0], expect)
+
+
 def test_vectorize():
     def lp_vec(p):
         return -0.5 * np.sum(p ** 2, axis=1)
@@ -227,6 +362,124 @@ def test_vectorize():
     assert sampler.get_chain().shape == (10, nwalkers, ndim)
 
 
+def test_vectorize_chunks():
+    sizes = []
+
+    def lp_vec(p):
+        sizes.append(len(p))
+        return -0.5 * np.sum(p ** 2, axis=1)
+
+    np.random.seed(42)
+    nwalkers, ndim = 32, 3
+    coords = np.random.randn(nwalkers, ndim)
+    sampler1 = EnsembleSampler(nwalkers, ndim, lp_vec, vectorize_chunks=5)
+    sampler1.run_mcmc(coords, 10)
+    assert sampler1.get_chain().shape == (10, nwalkers, ndim)
+    assert max(sizes) == 5
+
+    np.random.seed(42)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler2 = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    sampler2.run_mcmc(coords, 10)
+    assert np.allclose(sampler1.get_chain(), sampler2.get_chain())
+    assert np.allclose(sampler1.get_log_prob(), sampler2.get_log_prob())
+
+    with pytest.raises(ValueError):
+        EnsembleSampler(nwalkers, ndim, lp_vec, vectorize_chunks=0)
+
+
+def test_spawn_rngs(nwalkers=32, ndim=3, seed=1234):
+    np.random.seed(seed)
+    sampler = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    state = sampler.random_state
+
+    rngs = sampler.spawn_rngs(4)
+    assert len(rngs) == 4
+    draws = [rng.random(10) for rng in rngs]
+    for i in range(len(draws)):
+        for j in range(i + 1, len(draws)):
+            assert not np.allclose(draws[i], draws[j])
+
+    # The generators are determined by the state of the sampler
+    sampler.random_state = state
+    draws2 = [rng.random(10) for rng in sampler.spawn_rngs(4)]
+    assert all(np.allclose(a, b) for a, b in zip(draws, draws2))
+
+
+class _ReversedPool(object):
+    """A pool that returns the results of ``imap_unordered`` backwards"""
+
+    def __init__(self):
+        self.chunksizes = []
+
+    def map(self, f, iterable):
+        return list(map(f, iterable))
+
+    def imap_unordered(self, f, iterable, chunksize=1):
+        self.chunksizes.append(chunksize)
+        return reversed(list(map(f, iterable)))
+
+
+@pytest.mark.parametrize("pool_chunksize", [None, 3])
+def test_pool_imap(pool_chunksize, nwalkers=32, ndim=3, nsteps=10, seed=1234):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    pool = _ReversedPool()
+    sampler1 = EnsembleSampler(
+        nwalkers,
+        ndim,
+        normal_log_prob,
+        pool=pool,
+        pool_chunksize=pool_chunksize,
+    )
+    sampler1.run_mcmc(coords, nsteps)
+    assert set(pool.chunksizes) == {1 if pool_chunksize is None else 3}
+
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    with ThreadPool(2) as pool:
+        sampler2 = EnsembleSampler(nwalkers, ndim, normal_log_prob, pool=pool)
+        sampler2.run_mcmc(coords, nsteps)
+
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler3 = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    sampler3.run_mcmc(coords, nsteps)
+
+    for sampler in (sampler1, sampler2):
+        assert np.allclose(sampler.get_chain(), sampler3.get_chain())
+        assert np.allclose(sampler.get_log_prob(), sampler3.get_log_prob())
+
+
+@pytest.mark.parametrize("pool_class", [ThreadPool, Pool])
+def test_pool_shared_memory(
+    pool_class, nwalkers=32, ndim=3, nsteps=10, seed=1234
+):
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    with pool_class(2) as pool:
+        sampler1 = EnsembleSampler(
+            nwalkers,
+            ndim,
+            normal_log_prob,
+            pool=pool,
+            pool_shared_memory=True,
+        )
+        sampler1.run_mcmc(coords, nsteps)
+
+    np.random.seed(seed)
+    coords = np.random.randn(nwalkers, ndim)
+    sampler2 = EnsembleSampler(nwalkers, ndim, normal_log_prob)
+    sampler2.run_mcmc(coords, nsteps)
+
+    assert np.allclose(sampler1.get_chain(), sampler2.get_chain())
+    assert np.allclose(sampler1.get_log_prob(), sampler2.get_log_prob())
+
+    # The shared memory can't be pickled but it can be re-created
+    sampler3 = pickle.loads(pickle.dumps(sampler1, -1))
+    assert sampler3._shared_memory is None
+
+
 @pytest.mark.parametrize("backend", all_backends)
 def test_pickle(backend):
     with backend() as be: